@@ -0,0 +1,75 @@
+import random
+import string
+import sys
+import time
+
+from products import Product
+from search import ProductSearchIndex
+
+
+BRANDS = ["Sony", "Samsung", "Apple", "Lenovo", "Dell", "Bose", "Google", "Asus",
+          "Acer", "Logitech", "Philips", "Canon", "Nikon", "Garmin", "Razer", "Sonos"]
+KINDS = ["Laptop", "TV", "Headphones", "Earbuds", "Monitor", "Keyboard", "Mouse",
+         "Camera", "Speaker", "Tablet", "Phone", "Watch", "Router", "Charger"]
+FEATURES = ["Pro", "Max", "Mini", "Air", "Ultra", "Wireless", "Gaming", "Qwerty",
+            "Portable", "Smart", "Compact", "Slim", "4K", "OLED"]
+
+QUERIES = ["sony", "so", "s", "q", "zz", "sony tv", "sony laptop pro", "laptp",
+           "qwertz", "samsng oled", "wireless earbuds", "zz9999"]
+
+
+def random_names(rng, count) -> list[str]:
+    """
+    Creates product names made of a brand, a kind, a feature
+    and a model code. The model codes make the vocabulary
+    roughly as large as the number of names.
+
+    Args:
+        rng (random.Random): The random number generator.
+        count (int): The number of names.
+
+    Returns:
+        list[str]: The product names.
+    """
+    names = []
+    for _ in range(count):
+        model = "".join(rng.choices(string.ascii_lowercase, k=2)) + str(rng.randint(0, 99999))
+        names.append(f"{rng.choice(BRANDS)} {rng.choice(KINDS)} {rng.choice(FEATURES)} {model}")
+    return names
+
+
+def bench(count=1000000, repeat=20):
+    """
+    Builds an index over random product names and prints
+    the build time and the mean latency of each query.
+
+    Args:
+        count (int, optional): The number of products. Defaults to 1000000.
+        repeat (int, optional): The runs per query. Defaults to 20.
+    """
+    rng = random.Random(0)
+    products = [Product(name, price=1, quantity=1) for name in random_names(rng, count)]
+
+    start = time.perf_counter()
+    index = ProductSearchIndex(products)
+    print(f"build {count} products: {time.perf_counter() - start:.2f} s "
+          f"({len(index.postings)} tokens)")
+
+    start = time.perf_counter()
+    for product in products[:1000]:
+        index.remove(product)
+    for product in products[:1000]:
+        index.add(product)
+    print(f"remove + add 1000 products: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for query in QUERIES:
+        index.search(query)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{query!r:<20} {elapsed * 1000:8.3f} ms  {len(results)} results")
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,394 @@
+import copy
+import math
+import random
+import time
+
+from products import Product, NonStockedProduct, LimitedProduct
+from promotion import PercentageDiscount, FixedAmountDiscount, BuyOneGetOneFree
+from store import Store
+
+
+def reference_engine(shopping_list) -> float:
+    """
+    The reference order engine: the scalar Store.order.
+
+    Args:
+        shopping_list (list): A list of (product, quantity) tuples.
+
+    Returns:
+        float: The total price of the order.
+    """
+    return Store.order(shopping_list)
+
+
+# Alternative engines (batched, cached, sharded, ...) are registered
+# here next to the reference, so that their totals, stock and
+# throughput are checked by run_differential.
+ENGINES = {
+    "reference": reference_engine,
+}
+
+
+def random_promotion(rng):
+    """
+    Creates a random promotion, or None for no promotion.
+
+    Args:
+        rng (random.Random): The random number generator.
+
+    Returns:
+        PromotionInterface: The promotion, or None.
+    """
+    kind = rng.randrange(4)
+    if kind == 0:
+        return PercentageDiscount("Percentage", discount_percentage=rng.randint(1, 90))
+    if kind == 1:
+        return FixedAmountDiscount("Fixed", discount_amount=rng.randint(1, 200))
+    if kind == 2:
+        return BuyOneGetOneFree("Second one free")
+    return None
+
+
+def random_catalog(rng, size) -> list[Product]:
+    """
+    Creates a random catalog of products of every kind,
+    each with a random promotion.
+
+    Args:
+        rng (random.Random): The random number generator.
+        size (int): The number of products.
+
+    Returns:
+        list[Product]: The products of the catalog.
+    """
+    catalog = []
+    for i in range(size):
+        name = f"Product {i}"
+        price = rng.choice([rng.randint(0, 2000), round(rng.uniform(0, 2000), 2)])
+        kind = rng.random()
+        if kind < 0.7:
+            product = Product(name, price=price, quantity=rng.randint(20, 200))
+        elif kind < 0.85:
+            product = NonStockedProduct(name, price=price)
+        else:
+            product = LimitedProduct(name, price=price,
+                                     quantity=rng.randint(20, 200), maximum=rng.randint(1, 3))
+        product.set_promotion(random_promotion(rng))
+        catalog.append(product)
+    return catalog
+
+
+def random_quantity(rng, product, stock) -> int:
+    """
+    Picks a quantity of a product that can be ordered.
+
+    Args:
+        rng (random.Random): The random number generator.
+        product (Product): The product to order.
+        stock (int): The quantity of the product left.
+
+    Returns:
+        int: The quantity, or 0 if the product cannot be ordered.
+    """
+    if isinstance(product, NonStockedProduct):
+        return rng.randint(1, 5)
+    if isinstance(product, LimitedProduct):
+        return min(stock, rng.randint(1, product.maximum))
+    return min(stock, rng.randint(1, 10))
+
+
+def invalid_quantity(rng, product, stock) -> int:
+    """
+    Picks a quantity of a product that the order must reject.
+
+    Args:
+        rng (random.Random): The random number generator.
+        product (Product): The product to order.
+        stock (int): The quantity of the product left.
+
+    Returns:
+        int: The quantity, or 0 if every quantity is accepted.
+    """
+    if isinstance(product, NonStockedProduct):
+        return 0
+    if isinstance(product, LimitedProduct) and rng.random() < 0.5:
+        return product.maximum + 1
+    return stock + rng.randint(1, 5)
+
+
+def random_shopping_list(rng, catalog, stock, invalid_rate=0.05) -> list[tuple[int, int]]:
+    """
+    Creates a random shopping list for a catalog. Items refer
+    to products by catalog position, so that the same list can
+    be applied to independent copies of the catalog.
+
+    Quantities are picked so that the order succeeds, except
+    for an occasional line that must be rejected, to exercise
+    the error paths. The remaining stock is updated the way
+    the reference engine would update it: lines are bought in
+    order until the first rejected one.
+
+    Args:
+        rng (random.Random): The random number generator.
+        catalog (list): The products to shop from.
+        stock (list): The quantity left of each product,
+            updated in place.
+        invalid_rate (float, optional): The probability of
+            a rejected line per order. Defaults to 0.05.
+
+    Returns:
+        list[tuple[int, int]]: (catalog position, quantity) pairs.
+    """
+    shopping_list = []
+    for _ in range(rng.randint(1, 5)):
+        position = rng.randrange(len(catalog))
+        quantity = random_quantity(rng, catalog[position], stock[position])
+        if quantity:
+            shopping_list.append((position, quantity))
+    if rng.random() < invalid_rate:
+        position = rng.randrange(len(catalog))
+        quantity = invalid_quantity(rng, catalog[position], stock[position])
+        if quantity:
+            shopping_list.insert(rng.randint(0, len(shopping_list)), (position, quantity))
+    for position, quantity in shopping_list:
+        product = catalog[position]
+        if isinstance(product, NonStockedProduct):
+            continue
+        if quantity > stock[position] or (isinstance(product, LimitedProduct)
+                                           and quantity > product.maximum):
+            break
+        stock[position] -= quantity
+    return shopping_list
+
+
+def random_case(rng, catalog_size=20, orders=10):
+    """
+    Creates a random test case: a catalog and
+    a sequence of shopping lists to order from it.
+
+    Args:
+        rng (random.Random): The random number generator.
+        catalog_size (int, optional): The number of products. Defaults to 20.
+        orders (int, optional): The number of shopping lists. Defaults to 10.
+
+    Returns:
+        tuple: The catalog and the list of shopping lists.
+    """
+    catalog = random_catalog(rng, catalog_size)
+    stock = [product.quantity for product in catalog]
+    shopping_lists = [random_shopping_list(rng, catalog, stock) for _ in range(orders)]
+    return catalog, [shopping_list for shopping_list in shopping_lists if shopping_list]
+
+
+def expected_line_total(product, quantity) -> float:
+    """
+    Prices one line of an order from the pricing rules,
+    written independently of the promotion classes and
+    of Store.order:
+
+    - promotions only apply to stocked, unlimited products;
+      other products are charged the full price,
+    - a percentage discount takes that share off the price,
+    - a fixed discount takes its amount off, down to zero,
+    - "buy one, get one free" makes every second item free.
+
+    Args:
+        product (Product): The ordered product.
+        quantity (int): The ordered quantity.
+
+    Returns:
+        float: The price of the line.
+    """
+    full_price = product.price * quantity
+    promotion = product.promotion
+    if promotion is None or isinstance(product, (NonStockedProduct, LimitedProduct)):
+        return full_price
+    if isinstance(promotion, PercentageDiscount):
+        return full_price * (100 - promotion.discount_percentage) / 100
+    if isinstance(promotion, FixedAmountDiscount):
+        return max(full_price - promotion.discount_amount, 0)
+    if isinstance(promotion, BuyOneGetOneFree):
+        return product.price * math.ceil(quantity / 2)
+    raise ValueError(f"Unknown promotion: {promotion.name}")
+
+
+def promotion_mismatch(product, quantity):
+    """
+    Applies the promotion of a product directly and checks it
+    against the pricing rules: the promoted price must lie
+    between zero and the full price, and match expected_line_total.
+
+    Args:
+        product (Product): A stocked, unlimited product with a promotion.
+        quantity (int): The ordered quantity.
+
+    Returns:
+        tuple: The expected and actual price if they do not match,
+            otherwise None.
+    """
+    expected = expected_line_total(product, quantity)
+    actual = product.promotion.apply_promotion(product, quantity)
+    full_price = product.price * quantity
+    if (actual is None or not -1e-9 <= actual <= full_price + 1e-9
+            or not same_outcome(expected, actual)):
+        return expected, actual
+    return None
+
+
+def run_case(engine, catalog, shopping_lists):
+    """
+    Runs every shopping list of a case through an engine,
+    on a private copy of the catalog.
+
+    Args:
+        engine (callable): Takes a shopping list and returns its total.
+        catalog (list): The products of the case.
+        shopping_lists (list): (catalog position, quantity) pairs per order.
+
+    Returns:
+        tuple: The outcome of each order (its total, or the type of
+            the exception it raised), the final (quantity, active)
+            state of each product, and the seconds spent in the engine.
+    """
+    catalog = copy.deepcopy(catalog)
+    outcomes = []
+    elapsed = 0.0
+    for shopping_list in shopping_lists:
+        items = [(catalog[position], quantity) for position, quantity in shopping_list]
+        start = time.perf_counter()
+        try:
+            outcomes.append(engine(items))
+        except Exception as e:
+            outcomes.append(type(e))
+        elapsed += time.perf_counter() - start
+    stock = [(product.quantity, product.active) for product in catalog]
+    return outcomes, stock, elapsed
+
+
+def same_outcome(expected, actual) -> bool:
+    """
+    Compares the outcomes of an order in two engines.
+    Totals may differ by floating point rounding only.
+
+    Args:
+        expected: The reference total or exception type.
+        actual: The compared total or exception type.
+
+    Returns:
+        bool: True if the outcomes match.
+    """
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9)
+    return expected == actual
+
+
+def count_outcomes(engine_report, outcomes):
+    """
+    Adds the valid and rejected orders of a case to an engine report.
+
+    Args:
+        engine_report (dict): The report of the engine.
+        outcomes (list): The outcome of each order of the case.
+    """
+    errors = sum(1 for outcome in outcomes if isinstance(outcome, type))
+    engine_report["orders"] += len(outcomes)
+    engine_report["valid_orders"] += len(outcomes) - errors
+    engine_report["error_orders"] += errors
+
+
+def run_differential(engines=None, cases=100, seed=0, catalog_size=20, orders=10) -> dict:
+    """
+    Runs random cases through the reference engine and every
+    other engine, and compares the order outcomes and final stock.
+    The reference itself is checked against the pricing rules of
+    expected_line_total: every promotion of an ordered line is
+    applied directly with apply_promotion, and every successful
+    order total must be the sum of its expected line prices.
+
+    Args:
+        engines (dict, optional): Maps names to engines. Must contain
+            "reference". Defaults to ENGINES.
+        cases (int, optional): The number of random cases. Defaults to 100.
+        seed (int, optional): The seed of the random cases. Defaults to 0.
+        catalog_size (int, optional): The number of products per case.
+            Defaults to 20.
+        orders (int, optional): The number of orders per case. Defaults to 10.
+
+    Returns:
+        dict: Maps each engine name to a report with the number of
+            orders run, how many of them succeeded (valid_orders) and
+            were rejected (error_orders), the seconds spent, the orders
+            per second and the list of mismatches as
+            (case, order, expected, actual).
+            A mismatch with order None is a difference in the final stock.
+    """
+    engines = engines if engines is not None else ENGINES
+    rng = random.Random(seed)
+    report = {name: {"orders": 0, "valid_orders": 0, "error_orders": 0,
+                     "seconds": 0.0, "mismatches": []} for name in engines}
+    for case in range(cases):
+        catalog, shopping_lists = random_case(rng, catalog_size, orders)
+        expected_outcomes, expected_stock, elapsed = run_case(
+            engines["reference"], catalog, shopping_lists)
+        reference_report = report["reference"]
+        count_outcomes(reference_report, expected_outcomes)
+        reference_report["seconds"] += elapsed
+        for order, (shopping_list, outcome) in enumerate(zip(shopping_lists, expected_outcomes)):
+            for position, quantity in shopping_list:
+                product = catalog[position]
+                if product.promotion is None or type(product) is not Product:
+                    continue
+                mismatch = promotion_mismatch(product, quantity)
+                if mismatch:
+                    reference_report["mismatches"].append((case, order) + mismatch)
+            if isinstance(outcome, type):
+                continue
+            total = sum(expected_line_total(catalog[position], quantity)
+                        for position, quantity in shopping_list)
+            if not same_outcome(total, outcome):
+                reference_report["mismatches"].append((case, order, total, outcome))
+
+        for name, engine in engines.items():
+            if name == "reference":
+                continue
+            outcomes, stock, elapsed = run_case(engine, catalog, shopping_lists)
+            engine_report = report[name]
+            count_outcomes(engine_report, outcomes)
+            engine_report["seconds"] += elapsed
+            for order, (expected, actual) in enumerate(zip(expected_outcomes, outcomes)):
+                if not same_outcome(expected, actual):
+                    engine_report["mismatches"].append((case, order, expected, actual))
+            if stock != expected_stock:
+                engine_report["mismatches"].append((case, None, expected_stock, stock))
+    for engine_report in report.values():
+        seconds = engine_report["seconds"]
+        engine_report["orders_per_second"] = engine_report["orders"] / seconds if seconds else 0.0
+    return report
+
+
+def format_report(report) -> str:
+    """
+    Formats a differential report as a table.
+
+    Args:
+        report (dict): The report returned by run_differential.
+
+    Returns:
+        str: One line per engine with its valid and rejected
+            orders, its throughput, its speedup over the reference
+            and its mismatch count.
+    """
+    reference_rate = report["reference"]["orders_per_second"]
+    lines = [f"{'engine':<12} {'valid':>8} {'errors':>8} {'orders/s':>12} "
+             f"{'speedup':>8} {'mismatches':>10}"]
+    for name, engine_report in report.items():
+        rate = engine_report["orders_per_second"]
+        speedup = rate / reference_rate if reference_rate else 0.0
+        lines.append(f"{name:<12} {engine_report['valid_orders']:>8} "
+                     f"{engine_report['error_orders']:>8} {rate:>12.0f} "
+                     f"{speedup:>7.2f}x {len(engine_report['mismatches']):>10}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_report(run_differential()))
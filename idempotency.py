@@ -0,0 +1,147 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class IdempotencyCache:
+    """
+    A class representing a bounded, time-expiring cache
+    of results keyed by a client supplied idempotency key.
+
+    Entries are kept in insertion order, so both the oldest
+    and the first expired entries are always at the front.
+    When the same key is submitted concurrently, only the
+    first submission is computed and the others wait for its result.
+    Each key is bound to the fingerprint of the request it was
+    first submitted with, and failures are stored like results.
+
+    Attributes:
+        max_size (int): The maximum number of results kept.
+        ttl (float): The number of seconds a result is kept.
+        clock (callable): Returns the current time in seconds.
+
+    Methods:
+        get_or_compute(key, compute, fingerprint): Returns the stored result
+            for a key, or computes and stores it on the first submission.
+        __len__: Returns the number of stored results.
+    """
+    def __init__(self, max_size=10000, ttl=300, clock=time.monotonic):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_size (int, optional): The maximum number of results kept.
+                Defaults to 10000.
+            ttl (float, optional): The number of seconds a result is kept.
+                Defaults to 300.
+            clock (callable, optional): Returns the current time in seconds.
+                Defaults to time.monotonic.
+
+        Raises:
+            ValueError: If max_size or ttl is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        if ttl <= 0:
+            raise ValueError("Cache time to live must be positive")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of stored results.
+
+        Returns:
+            int: The number of stored results, expired ones included
+                until they are evicted.
+        """
+        return len(self._entries)
+
+    def _evict(self, now):
+        """
+        Removes the expired entries and, if the cache is full,
+        the oldest ones. Must be called with the lock held.
+
+        Args:
+            now (float): The current time.
+        """
+        while self._entries:
+            expires_at = next(iter(self._entries.values()))[0]
+            if expires_at > now and len(self._entries) < self.max_size:
+                break
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute, fingerprint=None):
+        """
+        Returns the stored result for a key. On the first submission
+        of a key, calls compute and stores its result.
+
+        If compute raises an Exception, a copy of it without its
+        traceback is stored instead, and a fresh copy is raised
+        for every resubmission of the key, since compute may have
+        had side effects before failing.
+
+        Args:
+            key (hashable): The idempotency key.
+            compute (callable): Computes the result for the key.
+            fingerprint (hashable, optional): Identifies the request
+                the key is submitted with. Defaults to None.
+
+        Returns:
+            The stored or freshly computed result.
+
+        Raises:
+            ValueError: If the key was first submitted
+                with a different fingerprint.
+            Exception: The exception stored for the key.
+        """
+        while True:
+            with self._lock:
+                now = self.clock()
+                entry = self._entries.get(key)
+                if entry is not None:
+                    expires_at, stored_fingerprint, result, error = entry
+                    if expires_at > now:
+                        if stored_fingerprint != fingerprint:
+                            raise ValueError("Idempotency key was already used for a different request")
+                        if error is not None:
+                            raise copy.copy(error)
+                        return result
+                    del self._entries[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # Another submission with this key is in progress:
+            # wait for it, then look the result up again.
+            pending.wait()
+
+        result = error = None
+        try:
+            result = compute()
+        except Exception as e:
+            error = e
+        except BaseException:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+            raise
+
+        with self._lock:
+            now = self.clock()
+            self._evict(now)
+            # The raised exception would keep every frame of its
+            # traceback alive, and each re-raise would extend it.
+            stored_error = copy.copy(error) if error is not None else None
+            self._entries[key] = (now + self.ttl, fingerprint, result, stored_error)
+            del self._pending[key]
+        pending.set()
+        if error is not None:
+            raise error
+        return result
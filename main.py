@@ -3,6 +3,10 @@ from products import Product, NonStockedProduct, LimitedProduct
 from store import Store
 from promotion import PercentageDiscount, FixedAmountDiscount, BuyOneGetOneFree
 
+# The order flow lists at most this many products;
+# the others are found by searching for their name.
+MAX_LISTED_PRODUCTS = 20
+
 
 def display_menu():
     """
@@ -68,10 +72,44 @@ def show_total_amount(store):
     print(f"Total of {total_amount} items in store\n")
 
 
+def find_product(store, query):
+    """
+    Search the store for a product by name and let the user
+    pick one of the matches.
+
+    Parameters:
+    - store: The object representing the store to search.
+    - query: The search text entered by the user.
+
+    Returns:
+    Product: The chosen product, or None if nothing was chosen.
+    """
+    matches = store.search(query)
+    if not matches:
+        print(f"Error: No product matches '{query}'.")
+        return None
+    if len(matches) == 1:
+        return matches[0]
+    for i, product in enumerate(matches, 1):
+        print(f"{i}. {product.name}, Price: ${product.price}, Quantity: {product.quantity}")
+    try:
+        match_index = int(input("Which of these products do you mean? ")) - 1
+    except ValueError:
+        print("Error: Invalid input. Please enter a valid number.")
+        return None
+    if 0 <= match_index < len(matches):
+        return matches[match_index]
+    print("Error: Invalid product number.")
+    return None
+
+
 def make_order(store):
     """
     Create an order by allowing the user
     to select products and quantities from the store.
+    Products can be selected by their list number
+    or searched for by name. Only the first
+    MAX_LISTED_PRODUCTS products are listed, once.
 
     Parameters:
     - store: The object representing the store
@@ -84,25 +122,34 @@ def make_order(store):
     and then places an order based on the shopping list.
     """
     shopping_list = []
+    print("------")
+    for i, product in enumerate(store.products[:MAX_LISTED_PRODUCTS], 1):
+        print(f"{i}. {product.name}, Price: ${product.price}, Quantity: {product.quantity}")
+    if len(store.products) > MAX_LISTED_PRODUCTS:
+        print(f"... and {len(store.products) - MAX_LISTED_PRODUCTS} more, search for them by name")
+    print("------")
     while True:
-        print("------")
-        list_all_products(store)
-        print("------")
-        product_index = input("Which product # do you want? (Enter empty text to finish order): ")
-        if not product_index:
+        product_choice = input("Which product # or name do you want? (Enter empty text to finish order): ")
+        if not product_choice:
             break
+        if product_choice.strip().isdecimal():
+            product_index = int(product_choice) - 1
+            if not 0 <= product_index < len(store.products):
+                print("Error: Invalid product number.")
+                continue
+            product = store.products[product_index]
+        else:
+            product = find_product(store, product_choice)
+            if product is None:
+                continue
         try:
-            product_index = int(product_index) - 1
-            if 0 <= product_index < len(store.products):
-                quantity = int(input("What amount do you want? "))
-                if quantity <= 0:
-                    print("Quantity must be a positive number.")
-                elif quantity > store.products[product_index].quantity:
-                    print("Error: Insufficient quantity in store.")
-                else:
-                    shopping_list.append((store.products[product_index], quantity))
+            quantity = int(input(f"What amount of {product.name} do you want? "))
+            if quantity <= 0:
+                print("Quantity must be a positive number.")
+            elif quantity > product.quantity:
+                print("Error: Insufficient quantity in store.")
             else:
-                print("Error: Invalid product number.")
+                shopping_list.append((product, quantity))
         except ValueError:
             print("Error: Invalid input. Please enter a valid number.")
 
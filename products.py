@@ -210,8 +210,7 @@ class LimitedProduct(Product):
     def buy(self, quantity):
         if quantity > self.maximum:
             raise ValueError("Quantity exceeds the maximum allowed quantity for this product")
-        else:
-            self.quantity -= quantity
+        return super().buy(quantity)
 
     def show(self):
         super().show()
@@ -53,6 +53,7 @@ class PercentageDiscount(PromotionInterface):
 class FixedAmountDiscount(PromotionInterface):
     """
     A promotion that offers a fixed amount discount on a product.
+    The discounted price never goes below zero.
 
     Attributes:
         discount_amount (float): The fixed amount discount to apply.
@@ -65,17 +66,18 @@ class FixedAmountDiscount(PromotionInterface):
         if isinstance(product, (NonStockedProduct, LimitedProduct)):
             return None
         original_price = product.price * quantity
-        return original_price - self.discount_amount
+        return max(original_price - self.discount_amount, 0)
 
 
 class BuyOneGetOneFree(PromotionInterface):
     """
-    A promotion that offers a "buy one, get one free" deal on a product.
+    A promotion that offers a "buy one, get one free" deal on a product:
+    every second item is free.
     """
     def apply_promotion(self, product: Product, quantity: int) -> float:
         if isinstance(product, (NonStockedProduct, LimitedProduct)):
             return None
-        original_price = product.price * quantity
-        return original_price // 2
+        paid_quantity = quantity - quantity // 2
+        return product.price * paid_quantity
     
         
\ No newline at end of file
@@ -0,0 +1,470 @@
+import re
+import string
+from bisect import bisect_left, insort
+from heapq import heappush, heapreplace, merge
+from itertools import islice
+from operator import itemgetter
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+TOKEN_ALPHABET = string.ascii_lowercase + string.digits
+
+
+def tokenize(text) -> list[str]:
+    """
+    Splits a text into lowercase alphanumeric tokens.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list[str]: The tokens found in the text, in order.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def edits(token) -> set[str]:
+    """
+    Returns every string one edit away from a token:
+    one character deleted, swapped with its neighbour,
+    replaced or inserted.
+
+    Args:
+        token (str): The token to edit.
+
+    Returns:
+        set[str]: The edited strings.
+    """
+    splits = [(token[:i], token[i:]) for i in range(len(token) + 1)]
+    deletes = [left + right[1:] for left, right in splits if right]
+    swaps = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
+    replaces = [left + char + right[1:] for left, right in splits if right for char in TOKEN_ALPHABET]
+    inserts = [left + char + right for left, right in splits for char in TOKEN_ALPHABET]
+    return set(deletes + swaps + replaces + inserts)
+
+
+class SortedTokens:
+    """
+    A class representing a sorted collection of tokens.
+
+    Tokens are kept in sorted chunks of bounded size, so adding
+    or removing a token only shifts one chunk instead of the
+    whole collection.
+
+    Attributes:
+        chunks (list): The sorted chunks of tokens.
+        maxes (list): The last (largest) token of each chunk.
+
+    Methods:
+        add(token): Adds a token.
+        remove(token): Removes a token.
+        count_between(low, high): Returns the number of tokens in a range.
+        iter_from(token): Iterates in order over the tokens not smaller than a token.
+    """
+    CHUNK_SIZE = 1000
+
+    def __init__(self, tokens=()):
+        """
+        Initializes the collection, sorting the given tokens once.
+
+        Args:
+            tokens (iterable, optional): The initial (distinct) tokens.
+        """
+        tokens = sorted(tokens)
+        self.chunks = [tokens[i:i + self.CHUNK_SIZE]
+                       for i in range(0, len(tokens), self.CHUNK_SIZE)]
+        self.maxes = [chunk[-1] for chunk in self.chunks]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of tokens.
+
+        Returns:
+            int: The number of tokens.
+        """
+        return sum(len(chunk) for chunk in self.chunks)
+
+    def add(self, token):
+        """
+        Adds a token, splitting its chunk if it grows too large.
+
+        Args:
+            token (str): The token to add.
+        """
+        if not self.chunks:
+            self.chunks.append([token])
+            self.maxes.append(token)
+            return
+        index = min(bisect_left(self.maxes, token), len(self.maxes) - 1)
+        chunk = self.chunks[index]
+        insort(chunk, token)
+        self.maxes[index] = chunk[-1]
+        if len(chunk) > 2 * self.CHUNK_SIZE:
+            self.chunks[index:index + 1] = [chunk[:self.CHUNK_SIZE], chunk[self.CHUNK_SIZE:]]
+            self.maxes[index:index + 1] = [chunk[self.CHUNK_SIZE - 1], chunk[-1]]
+
+    def remove(self, token):
+        """
+        Removes a token, dropping its chunk if it becomes empty.
+
+        Args:
+            token (str): The token to remove.
+
+        Raises:
+            ValueError: If the token is not in the collection.
+        """
+        index = bisect_left(self.maxes, token)
+        if index == len(self.maxes):
+            raise ValueError(f"Token not found: {token}")
+        chunk = self.chunks[index]
+        position = bisect_left(chunk, token)
+        if chunk[position] != token:
+            raise ValueError(f"Token not found: {token}")
+        del chunk[position]
+        if chunk:
+            self.maxes[index] = chunk[-1]
+        else:
+            del self.chunks[index]
+            del self.maxes[index]
+
+    def count_between(self, low, high) -> int:
+        """
+        Returns the number of tokens not smaller than low
+        and smaller than high.
+
+        Args:
+            low (str): The lower bound, included.
+            high (str): The upper bound, excluded.
+
+        Returns:
+            int: The number of tokens in the range.
+        """
+        low_index = bisect_left(self.maxes, low)
+        high_index = bisect_left(self.maxes, high)
+        count = sum(len(chunk) for chunk in self.chunks[low_index:high_index])
+        if low_index < len(self.chunks):
+            count -= bisect_left(self.chunks[low_index], low)
+        if high_index < len(self.chunks):
+            count += bisect_left(self.chunks[high_index], high)
+        return count
+
+    def iter_from(self, token):
+        """
+        Iterates in order over the tokens not smaller than a token.
+
+        Args:
+            token (str): The token to start from.
+
+        Yields:
+            str: The tokens, in sorted order.
+        """
+        index = bisect_left(self.maxes, token)
+        if index == len(self.maxes):
+            return
+        chunk = self.chunks[index]
+        for position in range(bisect_left(chunk, token), len(chunk)):
+            yield chunk[position]
+        for index in range(index + 1, len(self.chunks)):
+            yield from self.chunks[index]
+
+
+class ProductSearchIndex:
+    """
+    A class representing a search index over product names.
+
+    Keeps an inverted index from name tokens to products and
+    a sorted vocabulary for prefix lookups. Typo tolerance looks
+    up every string one edit away from a query term in the
+    inverted index. All structures are updated incrementally.
+
+    Attributes:
+        postings (dict): Maps each token to a dict from the ids of
+            the products whose name contains it to their rank,
+            the order in which the products were added.
+        vocabulary (SortedTokens): All indexed tokens, sorted.
+        products (dict): Maps product ids to the indexed products.
+        product_tokens (dict): Maps product ids to their name tokens.
+        ranks (dict): Maps product ids to their rank, by increasing rank.
+        next_rank (int): The rank of the next added product.
+
+    Methods:
+        add(product): Indexes a product by its name.
+        remove(product): Removes a product from the index.
+        search(query, limit): Returns the products best matching a query.
+        __contains__(product): Returns whether a product is indexed.
+    """
+    EXACT_SCORE = 3
+    PREFIX_SCORE = 2
+    FUZZY_SCORE = 1
+    # Terms matching at most this many tokens are checked by looking
+    # the product up in their posting lists rather than by scanning
+    # the tokens of the product name.
+    MAX_LOOKUP_TOKENS = 8
+    # A prefix matching more tokens than this is not expanded into
+    # its tokens: the products are scanned by rank instead, which is
+    # cheaper than merging that many posting lists.
+    MAX_MERGED_TOKENS = 256
+
+    def __init__(self, products=None):
+        """
+        Initializes the index and adds the given products to it.
+        The vocabulary is sorted once, after all products are indexed.
+
+        Args:
+            products (list, optional): The products to index.
+        """
+        self.postings = {}
+        self.products = {}
+        self.product_tokens = {}
+        self.ranks = {}
+        self.next_rank = 0
+        for product in products or []:
+            self._index(product)
+        self.vocabulary = SortedTokens(self.postings)
+
+    def __contains__(self, product) -> bool:
+        """
+        Returns whether a product is indexed.
+
+        Args:
+            product (Product): The product to look up.
+
+        Returns:
+            bool: True if the product is indexed, False otherwise.
+        """
+        return id(product) in self.products
+
+    def _index(self, product) -> list[str]:
+        """
+        Adds a product to the inverted index.
+
+        Args:
+            product (Product): The product to index.
+
+        Returns:
+            list[str]: The tokens of the product new to the vocabulary.
+        """
+        key = id(product)
+        if key in self.products:
+            return []
+        tokens = set(tokenize(product.name))
+        rank = self.next_rank
+        self.next_rank += 1
+        self.products[key] = product
+        self.product_tokens[key] = tokens
+        self.ranks[key] = rank
+        new_tokens = []
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                new_tokens.append(token)
+            posting[key] = rank
+        return new_tokens
+
+    def add(self, product):
+        """
+        Indexes a product by the tokens of its name.
+        Adding an already indexed product has no effect.
+
+        Args:
+            product (Product): The product to index.
+        """
+        for token in self._index(product):
+            self.vocabulary.add(token)
+
+    def remove(self, product):
+        """
+        Removes a product from the index.
+        Removing a product that is not indexed has no effect.
+
+        Args:
+            product (Product): The product to remove.
+        """
+        key = id(product)
+        if key not in self.products:
+            return
+        del self.products[key]
+        del self.ranks[key]
+        for token in self.product_tokens.pop(key):
+            posting = self.postings[token]
+            del posting[key]
+            if not posting:
+                del self.postings[token]
+                self.vocabulary.remove(token)
+
+    def _term_tiers(self, term) -> list[tuple[int, list]]:
+        """
+        Returns the vocabulary tokens matching a query term, grouped
+        by score, best first: the term itself, then every token it
+        is a prefix of. Only if there are none, the tokens one edit
+        away from the term are returned instead.
+
+        Args:
+            term (str): The query term.
+
+        Returns:
+            list[tuple[int, list]]: The score and tokens of each group.
+                The tokens are None for a prefix matching more than
+                MAX_MERGED_TOKENS tokens.
+        """
+        tiers = []
+        if term in self.postings:
+            tiers.append((self.EXACT_SCORE, [term]))
+        # "{" sorts after every character a token can contain.
+        count = self.vocabulary.count_between(term, term + "{") - len(tiers)
+        if count > self.MAX_MERGED_TOKENS:
+            tiers.append((self.PREFIX_SCORE, None))
+        elif count:
+            tokens = islice(self.vocabulary.iter_from(term), len(tiers), len(tiers) + count)
+            tiers.append((self.PREFIX_SCORE, list(tokens)))
+        if not tiers:
+            tokens = [token for token in sorted(edits(term)) if token in self.postings]
+            if tokens:
+                tiers.append((self.FUZZY_SCORE, tokens))
+        return tiers
+
+    def _tier_cost(self, tiers) -> int:
+        """
+        Estimates how many products the tiers of a term match.
+
+        Args:
+            tiers (list): The tiers returned by _term_tiers.
+
+        Returns:
+            int: The total size of their posting lists, or the number
+                of products if a tier is scanned.
+        """
+        cost = 0
+        for _, tokens in tiers:
+            if tokens is None:
+                return len(self.products)
+            cost += sum(len(self.postings[token]) for token in tokens)
+        return cost
+
+    def _candidates(self, term, tokens):
+        """
+        Iterates over the products of one tier, by increasing rank.
+        Posting lists are already in rank order, so they are merged
+        lazily; an unlisted prefix scans the products by rank.
+
+        Args:
+            term (str): The query term.
+            tokens (list): The tokens of the tier, or None for
+                every token the term is a (strict) prefix of.
+
+        Yields:
+            tuple[int, int]: The id and rank of each product,
+                possibly more than once.
+        """
+        if tokens is None:
+            for key, rank in self.ranks.items():
+                for token in self.product_tokens[key]:
+                    if token != term and token.startswith(term):
+                        yield key, rank
+                        break
+        elif len(tokens) == 1:
+            yield from self.postings[tokens[0]].items()
+        else:
+            yield from merge(*(self.postings[token].items() for token in tokens),
+                             key=itemgetter(1))
+
+    def _match_score(self, key, term, lookups) -> int:
+        """
+        Scores how well a product matches a query term.
+
+        Args:
+            key (int): The id of the product.
+            term (str): The query term.
+            lookups (list): The (posting list, score) pairs of the
+                tokens matching the term, best first, or None to
+                scan the tokens of the product name instead.
+
+        Returns:
+            int: The best score of the name tokens, 0 if none matches.
+        """
+        if lookups is not None:
+            for posting, score in lookups:
+                if key in posting:
+                    return score
+            return 0
+        score = 0
+        for token in self.product_tokens[key]:
+            if token == term:
+                return self.EXACT_SCORE
+            if token.startswith(term):
+                score = self.PREFIX_SCORE
+        return score
+
+    def search(self, query, limit=10) -> list:
+        """
+        Returns the products whose names best match a query.
+        Every query term must match a name token exactly,
+        as a prefix or, failing both, within one edit.
+        Products with the same score are returned in the order
+        they were added.
+
+        Candidates are taken from the term matching the fewest
+        products, by decreasing score and increasing rank, and
+        checked against the other terms, so the cost does not depend
+        on how common the other terms are. The search stops as soon
+        as no remaining candidate can beat the results found so far.
+
+        Args:
+            query (str): The search text.
+            limit (int, optional): The maximum number of results.
+                Defaults to 10.
+
+        Returns:
+            list[Product]: The matching products, best match first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        term_tiers = {term: self._term_tiers(term) for term in terms}
+        if not all(term_tiers.values()):
+            return []
+
+        driver = min(terms, key=lambda term: self._tier_cost(term_tiers[term]))
+        others = []
+        best_others = 0
+        for term in terms:
+            if term == driver:
+                continue
+            tiers = term_tiers[term]
+            lookups = None
+            if all(tokens is not None for _, tokens in tiers):
+                pairs = [(token, score) for score, tokens in tiers for token in tokens]
+                if len(pairs) <= self.MAX_LOOKUP_TOKENS or tiers[0][0] == self.FUZZY_SCORE:
+                    lookups = [(self.postings[token], score) for token, score in pairs]
+            others.append((term, lookups))
+            best_others += tiers[0][0]
+
+        # Min-heap of (score, -rank, key): the root is the worst result so far.
+        heap = []
+        seen = set()
+        for score, tokens in term_tiers[driver]:
+            bound = score + best_others
+            if len(heap) == limit and heap[0][0] > bound:
+                break
+            for key, rank in self._candidates(driver, tokens):
+                # Candidates come by increasing rank: once the worst result
+                # beats the best this one could score, it beats the rest too.
+                if len(heap) == limit and heap[0] > (bound, -rank):
+                    break
+                if key in seen:
+                    continue
+                seen.add(key)
+                total = score
+                for term, lookups in others:
+                    match = self._match_score(key, term, lookups)
+                    if not match:
+                        break
+                    total += match
+                else:
+                    entry = (total, -rank, key)
+                    if len(heap) < limit:
+                        heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapreplace(heap, entry)
+        return [self.products[key] for _, _, key in sorted(heap, reverse=True)]
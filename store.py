@@ -1,4 +1,6 @@
 from products import Product, NonStockedProduct, LimitedProduct
+from search import ProductSearchIndex
+from idempotency import IdempotencyCache
 
 
 class Store:
@@ -10,6 +12,13 @@ class Store:
     Attributes:
     - products (list): A list of Product objects representing
                 the products available in the store.
+    - search_index (ProductSearchIndex): An index over the product names,
+                kept in sync by add_product and remove_product.
+    - order_cache (IdempotencyCache): The default cache of recent orders,
+                keyed by the idempotency key they were placed with.
+                It is shared by every Store in the process, so keys
+                must be unique across stores unless a separate
+                cache is passed to order.
 
     Methods:
     - __init__(self, products=None): Initializes the Store with a list of products.
@@ -17,13 +26,19 @@ class Store:
     - add_product(self, product): Adds a new product to the store's product list.
     - remove_product(self, product): Removes a specified product
         from the store's product list.
+    - search(self, query, limit=10) -> list[Product]: Finds products
+        by name, tolerating prefixes and small typos.
     - get_total_quantity(self) -> int: Calculates and returns the total quantity
         of all products in the store.
     - get_all_products(self) -> list[Product]: Retrieves a list of all
         active products available in the store.
-    - order(self, shopping_list) -> float: Processes an order based
-        on a given shopping list and returns the total price of the order.
+    - order(shopping_list, idempotency_key=None, order_cache=None) -> float:
+        Processes an order based on a given shopping list and returns
+        the total price of the order. Repeated orders with the same key
+        return the first outcome.
     """
+    order_cache = IdempotencyCache()
+
     def __init__(self, products=None):
         """
         Initializes the Store with a list of products.
@@ -33,8 +48,14 @@ class Store:
         - products (list, optional): A list of Product objects
         representing the initial products available in the store.
         Defaults to None.
+
+        Raises:
+        ValueError: If a product appears more than once in the list.
         """
         self.products = products if products is not None else []
+        self.search_index = ProductSearchIndex(self.products)
+        if len(self.search_index.products) != len(self.products):
+            raise ValueError("A product cannot be in the store more than once")
 
     def add_product(self, product):
         """
@@ -45,9 +66,14 @@ class Store:
 
         Returns:
         None
-        """
 
+        Raises:
+        ValueError: If the product is already in the store.
+        """
+        if product in self.search_index:
+            raise ValueError("Product is already in the store")
         self.products.append(product)
+        self.search_index.add(product)
 
     def remove_product(self, product):
         """
@@ -62,6 +88,23 @@ class Store:
         """
         index = self.products.index(product)
         del self.products[index]
+        self.search_index.remove(product)
+
+    def search(self, query, limit=10) -> list[Product]:
+        """
+        Finds the products whose names best match a query.
+        Matches whole words, word prefixes and words
+        with small typos, best match first.
+
+        Args:
+        - query (str): The search text.
+        - limit (int, optional): The maximum number of results.
+        Defaults to 10.
+
+        Returns:
+        list[Product]: The matching products, best match first.
+        """
+        return self.search_index.search(query, limit)
 
     def get_total_quantity(self) -> int:
         """
@@ -89,12 +132,51 @@ class Store:
             if product.active is True:
                 products_list_active.append(product)
         return products_list_active
+
     @staticmethod
-    def order(shopping_list) -> float:
+    def order(shopping_list, idempotency_key=None, order_cache=None) -> float:
         """
         Processes an order based on a given shopping
         list and returns the total price of the order.
 
+        When an idempotency key is given, the order is only
+        processed the first time the key is seen. Resubmissions
+        of the key (e.g. client retries) return the stored total,
+        or raise the stored error if the order failed, without
+        touching the inventory again.
+
+        Args:
+        - shopping_list (list): A list of tuples
+            representing the products and quantities to be ordered.
+        - idempotency_key (hashable, optional): A client supplied key
+            identifying the order. Defaults to None.
+        - order_cache (IdempotencyCache, optional): The cache the key
+            is looked up in. Defaults to the shared Store.order_cache.
+
+        Returns:
+        float: The total price of the order.
+
+        Raises:
+        ValueError: If the key was already used with a different shopping list.
+        """
+        if idempotency_key is None:
+            return Store._place_order(shopping_list)
+        if order_cache is None:
+            order_cache = Store.order_cache
+        # The products themselves, not their ids: a cached entry keeps
+        # them alive, so a freed id cannot be reused by another product.
+        fingerprint = tuple((product, quantity) for product, quantity in shopping_list)
+        return order_cache.get_or_compute(
+            idempotency_key, lambda: Store._place_order(shopping_list), fingerprint)
+
+    @staticmethod
+    def _place_order(shopping_list) -> float:
+        """
+        Buys every item of a shopping list
+        and returns the total price of the order.
+        Items whose promotion does not apply to their
+        kind of product are charged the full price.
+
         Args:
         - shopping_list (list): A list of tuples
             representing the products and quantities to be ordered.
@@ -104,10 +186,12 @@ class Store:
         """
         total_price = 0
         for product, quantity in shopping_list:
-            if isinstance(product, LimitedProduct):
-                total_price += product.buy(quantity)
-            elif isinstance(product, NonStockedProduct):
+            if isinstance(product, NonStockedProduct):
                 total_price += product.price * quantity
-            else:
-                total_price += product.buy(quantity)
+                continue
+            item_price = product.buy(quantity)
+            if item_price is None:
+                # Promotions return None for products they do not apply to.
+                item_price = product.price * quantity
+            total_price += item_price
         return total_price
@@ -0,0 +1,44 @@
+import pytest
+from promotion import BuyOneGetOneFree
+from differential import ENGINES, reference_engine, run_differential, format_report
+
+
+def merge_lines_engine(shopping_list):
+    # A plausible but wrong fast path: buy each product once
+    # with the summed quantity of all its lines.
+    quantities = {}
+    for product, quantity in shopping_list:
+        quantities[product] = quantities.get(product, 0) + quantity
+    return reference_engine(list(quantities.items()))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_engines_match_reference(seed):
+    report = run_differential(ENGINES, cases=50, seed=seed)
+    for name, engine_report in report.items():
+        assert engine_report["mismatches"] == [], name
+        assert engine_report["valid_orders"] + engine_report["error_orders"] == engine_report["orders"]
+        assert engine_report["error_orders"] < 0.1 * engine_report["orders"]
+
+
+def test_harness_detects_wrong_engine():
+    engines = {"reference": reference_engine, "merged": merge_lines_engine}
+    report = run_differential(engines, cases=50, catalog_size=3, orders=10)
+    assert report["merged"]["mismatches"]
+    assert report["reference"]["mismatches"] == []
+
+
+def test_format_report_lists_every_engine():
+    engines = {"reference": reference_engine, "merged": merge_lines_engine}
+    report = run_differential(engines, cases=2)
+    lines = format_report(report).splitlines()
+    assert len(lines) == len(engines) + 1
+    assert lines[1].startswith("reference")
+    assert lines[2].startswith("merged")
+
+
+def test_harness_detects_wrong_promotion(monkeypatch):
+    monkeypatch.setattr(BuyOneGetOneFree, "apply_promotion",
+                        lambda self, product, quantity: product.price * quantity // 2)
+    report = run_differential(ENGINES, cases=20)
+    assert report["reference"]["mismatches"]
@@ -67,6 +67,39 @@ def test_purchase_exceeds_available_quantity(initial_quantity, purchase_quantity
         product.buy(purchase_quantity)
 
 
+
+# Test LimitedProduct purchases
+def test_limited_product_purchase_exceeding_maximum():
+    product = LimitedProduct("Shipping", 10.00, 250, maximum=1)
+    with pytest.raises(ValueError):
+        product.buy(2)
+    assert product.get_quantity() == 250
+
+
+def test_limited_product_purchase_exceeds_available_quantity():
+    product = LimitedProduct("Shipping", 10.00, 1, maximum=3)
+    with pytest.raises(Exception):
+        product.buy(2)
+    assert product.get_quantity() == 1
+
+
+@pytest.mark.parametrize("quantity, expected_total, expected_remaining", [
+    (1, 10.00, 4),
+    (3, 30.00, 2),
+])
+def test_limited_product_purchase_returns_total(quantity, expected_total, expected_remaining):
+    product = LimitedProduct("Shipping", 10.00, 5, maximum=3)
+    assert product.buy(quantity) == expected_total
+    assert product.get_quantity() == expected_remaining
+    assert product.is_active()
+
+
+def test_limited_product_becomes_inactive_at_zero_quantity():
+    product = LimitedProduct("Shipping", 10.00, 2, maximum=2)
+    product.buy(2)
+    assert product.get_quantity() == 0
+    assert not product.is_active()
+
 # Test promotion-related functionality
 def test_product_set_and_get_promotion():
     product = Product("Laptop", 999.99, 5)
@@ -85,6 +118,25 @@ def test_product_buy_with_promotion():
     # Assert discounted price based on promotion logic
     assert total_price < (product.price * 2)  # Discounted price
 
+
+@pytest.mark.parametrize("price, quantity, expected_total", [
+    (100, 1, 100),
+    (100, 2, 100),
+    (100, 3, 200),
+    (999.99, 2, 999.99),
+])
+def test_buy_one_get_one_free_makes_every_second_item_free(price, quantity, expected_total):
+    product = Product("Phone", price, 10)
+    promotion = BuyOneGetOneFree("Second one for Free!")
+    assert promotion.apply_promotion(product, quantity) == pytest.approx(expected_total)
+
+
+@pytest.mark.parametrize("quantity, expected_total", [(3, 100), (1, 0)])
+def test_fixed_amount_discount_does_not_go_below_zero(quantity, expected_total):
+    product = Product("Cable", 100, 10)
+    promotion = FixedAmountDiscount("Minus 200$ on all", 200)
+    assert promotion.apply_promotion(product, quantity) == expected_total
+
 @pytest.mark.usefixtures("mock_buy_for_non_stocked")
 def test_promotion_applies_to_product_types(product_types):
     # Test promotion on different product types
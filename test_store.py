@@ -0,0 +1,243 @@
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from differential import reference_engine, run_differential
+from idempotency import IdempotencyCache
+from products import Product, LimitedProduct
+from promotion import PercentageDiscount
+from search import ProductSearchIndex, SortedTokens
+from store import Store
+
+
+@pytest.fixture
+def store():
+    return Store([Product("MacBook Air M2", price=1450, quantity=100),
+                  Product("Bose QuietComfort Earbuds", price=250, quantity=500),
+                  Product("Google Pixel 7", price=500, quantity=250)])
+
+
+@pytest.mark.parametrize("query, expected_name", [
+    ("pixel", "Google Pixel 7"),  # exact word
+    ("macb", "MacBook Air M2"),  # word prefix
+    ("earbds", "Bose QuietComfort Earbuds"),  # typo
+    ("GOOGLE pixl", "Google Pixel 7"),  # case and typo across terms
+])
+def test_search_finds_product(store, query, expected_name):
+    results = store.search(query)
+    assert results[0].name == expected_name
+
+
+def test_search_ranks_exact_match_first(store):
+    store.add_product(Product("Pixelbook Go", price=650, quantity=10))
+    results = store.search("pixel")
+    assert [product.name for product in results] == ["Google Pixel 7", "Pixelbook Go"]
+
+
+def test_search_without_match_returns_empty_list(store):
+    assert store.search("keyboard") == []
+    assert store.search("google keyboard") == []
+    assert store.search("") == []
+
+
+def test_search_index_follows_add_and_remove(store):
+    headset = Product("Sony Headset", price=80, quantity=5)
+    store.add_product(headset)
+    assert store.search("headset") == [headset]
+
+    store.remove_product(headset)
+    assert store.search("headset") == []
+    assert store.search("sony") == []
+
+
+def test_store_rejects_duplicate_products(store):
+    pixel = store.products[2]
+    with pytest.raises(ValueError):
+        store.add_product(pixel)
+    with pytest.raises(ValueError):
+        Store([pixel, pixel])
+
+    store.remove_product(pixel)
+    assert pixel not in store.products
+    store.add_product(pixel)
+    assert store.search("pixel") == [pixel]
+
+def test_search_returns_ties_in_order_added(store):
+    cases = [Product(f"Pixel Case {i}", price=20, quantity=5) for i in range(3)]
+    for case in cases:
+        store.add_product(case)
+    assert store.search("case") == cases
+    assert store.search("case", limit=2) == cases[:2]
+
+
+def test_search_ties_across_prefix_tokens_keep_order_added():
+    store = Store([Product("Sony X", price=1, quantity=1), Product("Sonos Y", price=1, quantity=1)])
+    assert [product.name for product in store.search("so", limit=1)] == ["Sony X"]
+    assert [product.name for product in store.search("so", limit=2)] == ["Sony X", "Sonos Y"]
+
+
+@pytest.mark.parametrize("max_merged_tokens", [1000, 10])
+def test_search_prefix_matches_are_complete(monkeypatch, max_merged_tokens):
+    monkeypatch.setattr(ProductSearchIndex, "MAX_MERGED_TOKENS", max_merged_tokens)
+    cables = [Product(f"Cable sa{i:03}", price=1, quantity=1) for i in range(100)]
+    samsung = Product("Samsung TV", price=1, quantity=1)
+    store = Store(cables + [samsung])
+
+    assert store.search("sa", limit=200) == cables + [samsung]
+    assert store.search("sa", limit=1) == cables[:1]
+    assert store.search("sa tv") == [samsung]
+
+def test_search_requires_every_term_to_match(store):
+    store.add_product(Product("Google Pixel Case", price=20, quantity=5))
+    results = store.search("google case")
+    assert [product.name for product in results] == ["Google Pixel Case"]
+
+
+def test_sorted_tokens_stay_sorted_across_chunks(monkeypatch):
+    monkeypatch.setattr(SortedTokens, "CHUNK_SIZE", 2)
+    tokens = SortedTokens(["d", "b"])
+    for token in ["a", "f", "c", "e", "g", "h"]:
+        tokens.add(token)
+    assert list(tokens.iter_from("")) == list("abcdefgh")
+    assert len(tokens.chunks) > 1
+
+    for token in ["a", "d", "e", "h"]:
+        tokens.remove(token)
+    assert list(tokens.iter_from("c")) == ["c", "f", "g"]
+    assert len(tokens) == 4
+    assert tokens.count_between("c", "g") == 2
+    with pytest.raises(ValueError):
+        tokens.remove("z")
+
+
+def test_order_charges_full_price_when_promotion_does_not_apply():
+    shipping = LimitedProduct("Shipping", price=10, quantity=5, maximum=2)
+    shipping.set_promotion(PercentageDiscount("30% off!", discount_percentage=30))
+    assert Store.order([(shipping, 2)]) == 20
+    assert shipping.get_quantity() == 3
+
+# Test order idempotency
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(Store, "order_cache", IdempotencyCache(max_size=2, ttl=60, clock=clock))
+    return clock
+
+
+def test_order_with_repeated_key_buys_once(store, clock):
+    pixel = store.products[2]
+
+    first_total = Store.order([(pixel, 2)], idempotency_key="checkout-1")
+    retry_total = Store.order([(pixel, 2)], idempotency_key="checkout-1")
+
+    assert retry_total == first_total == 1000
+    assert pixel.get_quantity() == 248
+
+
+def test_order_key_expires_after_ttl(store, clock):
+    pixel = store.products[2]
+    Store.order([(pixel, 1)], idempotency_key="checkout-1")
+
+    clock.now += 61
+    Store.order([(pixel, 1)], idempotency_key="checkout-1")
+
+    assert pixel.get_quantity() == 248
+
+
+def test_order_cache_evicts_oldest_key_when_full(store, clock):
+    pixel = store.products[2]
+    for key in ["checkout-1", "checkout-2", "checkout-3"]:
+        Store.order([(pixel, 1)], idempotency_key=key)
+    assert len(Store.order_cache) == 2
+
+    Store.order([(pixel, 1)], idempotency_key="checkout-3")
+    assert pixel.get_quantity() == 247
+    Store.order([(pixel, 1)], idempotency_key="checkout-1")
+    assert pixel.get_quantity() == 246
+
+
+def test_retried_failed_order_does_not_buy_again(store, clock):
+    macbook, earbuds = store.products[0], store.products[1]
+    shopping_list = [(macbook, 2), (earbuds, 1000)]
+    with pytest.raises(Exception) as first_error:
+        Store.order(shopping_list, idempotency_key="checkout-1")
+    retry_errors = []
+    for _ in range(5):
+        with pytest.raises(Exception) as retry_error:
+            Store.order(shopping_list, idempotency_key="checkout-1")
+        retry_errors.append(retry_error.value)
+
+    for error in retry_errors:
+        assert error is not first_error.value
+        assert type(error) is type(first_error.value)
+        assert error.args == first_error.value.args
+    # Each retry raises a fresh exception, so tracebacks do not pile up.
+    assert len(set(map(id, retry_errors))) == len(retry_errors)
+    assert len(traceback.extract_tb(retry_errors[-1].__traceback__)) == len(
+        traceback.extract_tb(retry_errors[0].__traceback__))
+    assert macbook.get_quantity() == 98
+    assert earbuds.get_quantity() == 500
+
+
+def test_order_key_reused_for_other_shopping_list(store, clock):
+    macbook, pixel = store.products[0], store.products[2]
+    Store.order([(pixel, 1)], idempotency_key="checkout-1")
+    with pytest.raises(ValueError):
+        Store.order([(macbook, 1), (pixel, 3)], idempotency_key="checkout-1")
+
+    assert macbook.get_quantity() == 100
+    assert pixel.get_quantity() == 249
+
+
+
+def test_order_key_is_bound_to_product_objects(store, clock):
+    pixel = store.products[2]
+    other_pixel = Product(pixel.name, price=pixel.price, quantity=10)
+    Store.order([(pixel, 1)], idempotency_key="checkout-1")
+    with pytest.raises(ValueError):
+        Store.order([(other_pixel, 1)], idempotency_key="checkout-1")
+    assert other_pixel.get_quantity() == 10
+
+def test_order_uses_given_cache(store, clock):
+    pixel = store.products[2]
+    order_cache = IdempotencyCache()
+    Store.order([(pixel, 1)], idempotency_key="checkout-1", order_cache=order_cache)
+    Store.order([(pixel, 1)], idempotency_key="checkout-1", order_cache=order_cache)
+
+    assert len(order_cache) == 1
+    assert len(Store.order_cache) == 0
+    assert pixel.get_quantity() == 249
+
+
+def test_concurrent_orders_with_same_key_buy_once(store, clock):
+    pixel = store.products[2]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        totals = list(executor.map(
+            lambda _: Store.order([(pixel, 1)], idempotency_key="checkout-1"), range(32)))
+
+    assert totals == [500] * 32
+    assert pixel.get_quantity() == 249
+
+
+def test_retried_random_orders_match_reference():
+    order_cache = IdempotencyCache()
+
+    def retried_engine(shopping_list):
+        key = object()
+        try:
+            Store.order(shopping_list, idempotency_key=key, order_cache=order_cache)
+        except Exception:
+            pass
+        return Store.order(shopping_list, idempotency_key=key, order_cache=order_cache)
+
+    report = run_differential({"reference": reference_engine, "retried": retried_engine}, cases=20)
+    assert report["retried"]["error_orders"] > 0
+    assert report["retried"]["mismatches"] == []